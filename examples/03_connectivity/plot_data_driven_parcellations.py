@@ -69,23 +69,27 @@ start = time.time()
 
 # We build parameters of our own for this object. Parameters related to
 # masking, caching and defining number of clusters and specific parcellations
-# method.
+# method. With memory_level=2, the dimension reduction applied to the masked
+# and smoothed data is cached as well, so that everything before the
+# clustering itself is computed only once for both ward parcellations below.
 ward = Parcellations(method='ward', n_parcels=1000,
                      standardize=False, smoothing_fwhm=2.,
-                     memory='nilearn_cache', memory_level=1,
+                     memory='nilearn_cache', memory_level=2,
                      verbose=1)
 # Call fit on functional dataset: single subject (less samples).
 ward.fit(dataset.func)
 print("Ward agglomeration 1000 clusters: %.2fs" % (time.time() - start))
 
 # We compute now ward clustering with 2000 clusters and compare
-# time with 1000 clusters. To see the benefits of caching for second time.
+# time with 1000 clusters. To see the benefits of caching for second time:
+# the full ward tree has been cached by the first fit, so this one only
+# needs to cut it at a different number of parcels.
 
 # We initialize class again with n_parcels=2000 this time.
 start = time.time()
 ward = Parcellations(method='ward', n_parcels=2000,
                      standardize=False, smoothing_fwhm=2.,
-                     memory='nilearn_cache', memory_level=1,
+                     memory='nilearn_cache', memory_level=2,
                      verbose=1)
 ward.fit(dataset.func)
 print("Ward agglomeration 2000 clusters: %.2fs" % (time.time() - start))
@@ -122,15 +126,20 @@ cut_coords = first_plot.cut_coords
 # Grab number of voxels from attribute mask image (mask_img_).
 import numpy as np
 from nilearn.image import get_data
-original_voxels = np.sum(get_data(ward.mask_img_))
+original_voxels = np.count_nonzero(get_data(ward.mask_img_))
 
 # Compute mean over time on the functional image to use the mean
-# image for compressed representation comparisons
-mean_func_img = mean_img(dataset.func[0])
+# image for compressed representation comparisons. We cache it in the same
+# 'nilearn_cache' directory as the parcellations, to avoid recomputation
+# when the example is run again.
+from joblib import Memory
+mem = Memory('nilearn_cache')
+mean_func_img = mem.cache(mean_img)(dataset.func[0])
 
 # Compute common vmin and vmax
-vmin = np.min(get_data(mean_func_img))
-vmax = np.max(get_data(mean_func_img))
+mean_func_data = get_data(mean_func_img)
+vmin = np.min(mean_func_data)
+vmax = np.max(mean_func_data)
 
 plotting.plot_epi(mean_func_img, cut_coords=cut_coords,
                   title='Original (%i voxels)' % original_voxels,
@@ -144,8 +153,9 @@ plotting.plot_epi(mean_func_img, cut_coords=cut_coords,
 fmri_reduced = ward.transform(dataset.func)
 
 # Display the corresponding data compressed using the parcellation using
-# parcels=2000.
-fmri_compressed = ward.inverse_transform(fmri_reduced)
+# parcels=2000. Only the first scan is displayed, so we only send this scan
+# back to brain space.
+fmri_compressed = ward.inverse_transform(fmri_reduced[:1])
 
 plotting.plot_epi(index_img(fmri_compressed, 0),
                   cut_coords=cut_coords,
@@ -213,7 +223,7 @@ start = time.time()
 rena = Parcellations(method='rena', n_parcels=5000, standardize=False,
                      smoothing_fwhm=2., scaling=True)
 
-rena.fit_transform(dataset.func)
+rena.fit(dataset.func)
 print("ReNA 5000 clusters: %.2fs" % (time.time() - start))
 
 ##################################################################
@@ -228,7 +238,7 @@ rena_labels_img = rena.labels_img_
 # with the following code:
 rena_labels_img.to_filename('rena_parcellation.nii.gz')
 
-plotting.plot_roi(ward_labels_img, title="ReNA parcellation",
+plotting.plot_roi(rena_labels_img, title="ReNA parcellation",
                   display_mode='xz', cut_coords=cut_coords)
 
 ##################################################################
@@ -255,8 +265,9 @@ plotting.plot_epi(mean_func_img, cut_coords=cut_coords,
 # index_img to do the split easily:
 fmri_reduced_rena = rena.transform(dataset.func)
 
-# Display the corresponding data compression using the parcellation
-compressed_img_rena = rena.inverse_transform(fmri_reduced_rena)
+# Display the corresponding data compression using the parcellation,
+# here again for the first scan only
+compressed_img_rena = rena.inverse_transform(fmri_reduced_rena[:1])
 
 plotting.plot_epi(index_img(compressed_img_rena, 0), cut_coords=cut_coords,
                   title='ReNA compressed representation (5000 parcels)',
@@ -761,6 +761,16 @@ def apply_mask(imgs, mask_img, dtype='f',
                             ensure_finite=ensure_finite)
 
 
+def _mask_bounding_box(mask):
+    """Return the slices of the smallest box containing a non-empty mask."""
+    bbox = []
+    for axis in range(mask.ndim):
+        other_axes = tuple(ax for ax in range(mask.ndim) if ax != axis)
+        indices = np.flatnonzero(mask.any(axis=other_axes))
+        bbox.append(slice(indices[0], indices[-1] + 1))
+    return tuple(bbox)
+
+
 def _apply_mask_fmri(imgs, mask_img, dtype='f',
                      smoothing_fwhm=None, ensure_finite=True):
     """Same as apply_mask().
@@ -790,11 +800,23 @@ def _apply_mask_fmri(imgs, mask_img, dtype='f',
         raise ValueError('Mask shape: %s is different from img shape:%s'
                          % (str(mask_data.shape), str(imgs_img.shape[:3])))
 
+    if smoothing_fwhm is None and mask_data.any():
+        # Without smoothing, only the voxels in the bounding box of the mask
+        # are needed: slicing the data object reads (and copies) only these
+        # voxels instead of the whole image.
+        bbox = _mask_bounding_box(mask_data)
+        mask_data = mask_data[bbox]
+        data_cache = getattr(imgs_img, '_data_cache', None)
+        if data_cache is not None:
+            series = data_cache[bbox]
+        else:
+            series = np.asanyarray(imgs_img.dataobj[bbox])
+    else:
+        series = _safe_get_data(imgs_img)
+
     # All the following has been optimized for C order.
     # Time that may be lost in conversion here is regained multiple times
     # afterward, especially if smoothing is applied.
-    series = _safe_get_data(imgs_img)
-
     if dtype == 'f':
         if series.dtype.kind == 'f':
             dtype = series.dtype
@@ -5,9 +5,10 @@ Tests for the permuted_ols function.
 # Author: Virgile Fritsch, <virgile.fritsch@inria.fr>, Feb. 2014
 import numpy as np
 from scipy import stats
+from scipy.special import stdtr
 from sklearn.utils import check_random_state
 
-from numpy.testing import (assert_almost_equal, assert_array_almost_equal,
+from numpy.testing import (assert_allclose, assert_array_almost_equal,
                            assert_array_less, assert_equal)
 import pytest
 
@@ -57,15 +58,17 @@ def get_tvalue_with_alternative_library(tested_vars, target_vars, covars=None):
     try:  # try with statsmodels if available (more concise)
         from statsmodels.regression.linear_model import OLS
         t_values = np.empty((n_descriptors, n_regressors))
-        for i in range(n_descriptors):
-            current_target = target_vars[:, i].reshape((-1, 1))
-            for j in range(n_regressors):
-                current_tested_mask = mask_covars.copy()
-                current_tested_mask[j] = True
-                current_design_matrix = design_matrix[:, current_tested_mask]
+        for j in range(n_regressors):
+            current_tested_mask = mask_covars.copy()
+            current_tested_mask[j] = True
+            current_design_matrix = design_matrix[:, current_tested_mask]
+            for i in range(n_descriptors):
+                current_target = target_vars[:, i].reshape((-1, 1))
                 ols_fit = OLS(current_target, current_design_matrix).fit()
-                t_values[i, j] = np.ravel(ols_fit.t_test(test_matrix).tvalue)
-    except:  # use linalg if statsmodels is not available
+                # the tested variate is the first column of the design, so
+                # its t-value is read directly rather than via a t_test
+                t_values[i, j] = np.ravel(ols_fit.tvalues)[0]
+    except ImportError:  # use linalg if statsmodels is not available
         from numpy import linalg
         lost_dof = n_covars + 1  # fit all tested variates independently
         t_values = np.empty((n_descriptors, n_regressors))
@@ -78,21 +81,34 @@ def get_tvalue_with_alternative_library(tested_vars, target_vars, covars=None):
             t_val_denom_aux = np.diag(
                 np.dot(test_matrix, np.dot(normalized_cov, test_matrix.T)))
             t_val_denom_aux = t_val_denom_aux.reshape((-1, 1))
-            for j in range(n_descriptors):
-                current_target = target_vars[:, j].reshape((-1, 1))
-                res_lstsq = linalg.lstsq(current_design_matrix, current_target)
-                residuals = (current_target
-                             - np.dot(current_design_matrix, res_lstsq[0]))
-                t_val_num = np.dot(test_matrix, res_lstsq[0])
-                t_val_denom = np.sqrt(
-                    np.sum(residuals ** 2, 0) / float(n_samples - lost_dof)
-                    * t_val_denom_aux)
-                t_values[j, i] = np.ravel(t_val_num / t_val_denom)
+            # all descriptors share the design: fit them in a single lstsq
+            res_lstsq = linalg.lstsq(current_design_matrix, target_vars)
+            residuals = (target_vars
+                         - np.dot(current_design_matrix, res_lstsq[0]))
+            t_val_num = np.dot(test_matrix, res_lstsq[0])
+            t_val_denom = np.sqrt(
+                np.sum(residuals ** 2, 0) / float(n_samples - lost_dof)
+                * t_val_denom_aux)
+            t_values[:, i] = np.ravel(t_val_num / t_val_denom)
     t_values = t_values.T
     assert t_values.shape == (n_regressors, n_descriptors)
     return t_values
 
 
+def _compare_h0_to_t_distribution(h0, dof, empirical_cdf):
+    """Compare a permutation null distribution to a t(dof) distribution
+
+    Returns the p-value of a Kolmogorov-Smirnov test, and the Mean Squared
+    Error between the theoretical cumulative distribution function evaluated
+    on the sorted h0 and the empirical one. h0 is sorted in place.
+
+    """
+    kstest_pval = stats.kstest(h0, stats.t(dof).cdf)[1]
+    h0.sort()
+    mse = np.mean((stdtr(dof, h0) - empirical_cdf) ** 2)
+    return kstest_pval, mse
+
+
 ### Tests t-scores computation ################################################
 def test_t_score_with_covars_and_normalized_design_nocovar(random_state=0):
     rng = check_random_state(random_state)
@@ -164,42 +180,35 @@ def test_permuted_ols_check_h0_noeffect_labelswap(random_state=0):
     all_mse = []
     all_mse_intercept = []
     all_mse_intercept2 = []
+    empirical_cdf = dict((n_perm, np.linspace(0, 1, n_perm + 1)[1:])
+                         for n_perm in perm_ranges)
     for i, n_perm in enumerate(np.repeat(perm_ranges, 10)):
         ### Case no. 1: no intercept in the model
         pval, orig_scores, h0 = permuted_ols(
             tested_var, target_var, model_intercept=False,
             n_perm=n_perm, two_sided_test=False, random_state=i)
         assert_equal(h0.size, n_perm)
-        # Kolmogorov-Smirnov test
-        kstest_pval = stats.kstest(h0, stats.t(n_samples - 1).cdf)[1]
+        kstest_pval, mse = _compare_h0_to_t_distribution(
+            h0, n_samples - 1, empirical_cdf[n_perm])
         all_kstest_pvals.append(kstest_pval)
-        mse = np.mean(
-            (stats.t(n_samples - 1).cdf(np.sort(h0))
-             - np.linspace(0, 1, h0.size + 1)[1:]) ** 2)
         all_mse.append(mse)
         ### Case no. 2: intercept in the model
         pval, orig_scores, h0 = permuted_ols(
             tested_var, target_var, model_intercept=True,
             n_perm=n_perm, two_sided_test=False, random_state=i)
         assert_array_less(pval, 1.)  # pval should not be significant
-        # Kolmogorov-Smirnov test
-        kstest_pval = stats.kstest(h0, stats.t(n_samples - 2).cdf)[1]
+        kstest_pval, mse = _compare_h0_to_t_distribution(
+            h0, n_samples - 2, empirical_cdf[n_perm])
         all_kstest_pvals_intercept.append(kstest_pval)
-        mse = np.mean(
-            (stats.t(n_samples - 2).cdf(np.sort(h0))
-             - np.linspace(0, 1, h0.size + 1)[1:]) ** 2)
         all_mse_intercept.append(mse)
         ### Case no. 3: intercept in the model, no centering of tested vars
         pval, orig_scores, h0 = permuted_ols(
             tested_var_not_centered, target_var, model_intercept=True,
             n_perm=n_perm, two_sided_test=False, random_state=i)
         assert_array_less(pval, 1.)  # pval should not be significant
-        # Kolmogorov-Smirnov test
-        kstest_pval = stats.kstest(h0, stats.t(n_samples - 2).cdf)[1]
+        kstest_pval, mse = _compare_h0_to_t_distribution(
+            h0, n_samples - 2, empirical_cdf[n_perm])
         all_kstest_pvals_intercept2.append(kstest_pval)
-        mse = np.mean(
-            (stats.t(n_samples - 2).cdf(np.sort(h0))
-             - np.linspace(0, 1, h0.size + 1)[1:]) ** 2)
         all_mse_intercept2.append(mse)
     all_kstest_pvals = np.array(all_kstest_pvals).reshape(
         (len(perm_ranges), -1))
@@ -241,17 +250,16 @@ def test_permuted_ols_check_h0_noeffect_signswap(random_state=0):
     # we compute the Mean Squared Error between cumulative Density Function
     # as a proof of consistency of the permutation algorithm
     all_mse = []
+    empirical_cdf = dict((n_perm, np.linspace(0, 1, n_perm + 1)[1:])
+                         for n_perm in perm_ranges)
     for i, n_perm in enumerate(np.repeat(perm_ranges, 10)):
         pval, orig_scores, h0 = permuted_ols(
             tested_var, target_var, model_intercept=False,
             n_perm=n_perm, two_sided_test=False, random_state=i)
         assert_equal(h0.size, n_perm)
-        # Kolmogorov-Smirnov test
-        kstest_pval = stats.kstest(h0, stats.t(n_samples).cdf)[1]
+        kstest_pval, mse = _compare_h0_to_t_distribution(
+            h0, n_samples, empirical_cdf[n_perm])
         all_kstest_pvals.append(kstest_pval)
-        mse = np.mean(
-            (stats.t(n_samples).cdf(np.sort(h0))
-             - np.linspace(0, 1, h0.size + 1)[1:]) ** 2)
         all_mse.append(mse)
     all_kstest_pvals = np.array(all_kstest_pvals).reshape(
         (len(perm_ranges), -1))
@@ -284,13 +292,13 @@ def test_permuted_ols_nocovar(random_state=0):
     _, own_score, _ = permuted_ols(
         tested_var, target_var, model_intercept=False,
         n_perm=0, random_state=random_state)
-    assert_array_almost_equal(ref_score, own_score, decimal=6)
+    assert_allclose(ref_score, own_score, rtol=0, atol=1.5e-6)
 
     # test with ravelized tested_var
     _, own_score, _ = permuted_ols(
         np.ravel(tested_var), target_var, model_intercept=False,
         n_perm=0, random_state=random_state)
-    assert_array_almost_equal(ref_score, own_score, decimal=6)
+    assert_allclose(ref_score, own_score, rtol=0, atol=1.5e-6)
 
     ### Adds intercept (should be equivalent to centering variates)
     # permuted OLS
@@ -303,8 +311,8 @@ def test_permuted_ols_nocovar(random_state=0):
     # compute t-scores with linalg or statsmodels
     ref_score_intercept = get_tvalue_with_alternative_library(
         tested_var, target_var, np.ones((n_samples, 1)))
-    assert_array_almost_equal(ref_score_intercept, own_score_intercept,
-                              decimal=6)
+    assert_allclose(ref_score_intercept, own_score_intercept,
+                    rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_nocovar_warning(random_state=0):
@@ -365,7 +373,7 @@ def test_permuted_ols_withcovar(random_state=0):
         tested_var, target_var, confounding_vars, model_intercept=False,
         n_perm=0, random_state=random_state)
     assert own_score.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_score, own_score, decimal=6)
+    assert_allclose(ref_score, own_score, rtol=0, atol=1.5e-6)
 
     ### Adds intercept
     # permuted OLS
@@ -379,8 +387,8 @@ def test_permuted_ols_withcovar(random_state=0):
     alt_score_intercept = get_tvalue_with_alternative_library(
         tested_var, target_var, confounding_vars)
     assert alt_score_intercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(alt_score_intercept, own_score_intercept,
-                              decimal=6)
+    assert_allclose(alt_score_intercept, own_score_intercept,
+                    rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_nocovar_multivariate(random_state=0):
@@ -407,7 +415,7 @@ def test_permuted_ols_nocovar_multivariate(random_state=0):
     _, own_scores, _ = permuted_ols(
         tested_var, target_vars, model_intercept=False,
         n_perm=0, random_state=random_state)
-    assert_array_almost_equal(ref_scores, own_scores, decimal=6)
+    assert_allclose(ref_scores, own_scores, rtol=0, atol=1.5e-6)
 
     ### Adds intercept (should be equivalent to centering variates)
     # permuted OLS
@@ -421,8 +429,8 @@ def test_permuted_ols_nocovar_multivariate(random_state=0):
     ref_scores_intercept = get_tvalue_with_alternative_library(
         tested_var, target_vars, np.ones((n_samples, 1))
     )
-    assert_array_almost_equal(ref_scores_intercept, own_scores_intercept,
-                              decimal=6)
+    assert_allclose(ref_scores_intercept, own_scores_intercept,
+                    rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_withcovar_multivariate(random_state=0):
@@ -454,7 +462,7 @@ def test_permuted_ols_withcovar_multivariate(random_state=0):
         tested_var, target_vars, confounding_vars, model_intercept=False,
         n_perm=0, random_state=random_state)
     assert own_scores.shape == (n_regressors, n_descriptors)
-    assert_almost_equal(ref_scores, own_scores, decimal=6)
+    assert_allclose(ref_scores, own_scores, rtol=0, atol=1.5e-6)
 
     ### Adds intercept
     # permuted OLS
@@ -468,8 +476,8 @@ def test_permuted_ols_withcovar_multivariate(random_state=0):
     ref_scores_intercept = get_tvalue_with_alternative_library(
         tested_var, target_vars, confounding_vars)
     assert ref_scores_intercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_scores_intercept,
-                              own_scores_intercept, decimal=6)
+    assert_allclose(ref_scores_intercept,
+                    own_scores_intercept, rtol=0, atol=1.5e-6)
 
 
 ### Tests for sign swapping permutation scheme ##############################
@@ -496,14 +504,14 @@ def test_permuted_ols_intercept_nocovar(random_state=0):
     assert neg_log_pvals.shape == (n_regressors, n_descriptors)
     assert orig_scores.shape == (n_regressors, n_descriptors)
     assert_array_less(neg_log_pvals, 1.)  # ensure sign swap is correctly done
-    assert_array_almost_equal(t_val_ref, orig_scores, decimal=6)
+    assert_allclose(t_val_ref, orig_scores, rtol=0, atol=1.5e-6)
 
     # same thing but with model_intercept=True to check it has no effect
     _, orig_scores_addintercept, _ = permuted_ols(
         tested_var, target_var, confounding_vars=None, model_intercept=False,
         n_perm=0, random_state=random_state)
     assert orig_scores_addintercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(t_val_ref, orig_scores_addintercept, decimal=6)
+    assert_allclose(t_val_ref, orig_scores_addintercept, rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_intercept_statsmodels_withcovar(random_state=0):
@@ -530,14 +538,14 @@ def test_permuted_ols_intercept_statsmodels_withcovar(random_state=0):
         tested_var, target_var, confounding_vars, n_perm=0,
         random_state=random_state)
     assert own_scores.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_scores, own_scores, decimal=6)
+    assert_allclose(ref_scores, own_scores, rtol=0, atol=1.5e-6)
 
     # same thing but with model_intercept=True to check it has no effect
     _, own_scores_intercept, _ = permuted_ols(
         tested_var, target_var, confounding_vars, model_intercept=True,
         n_perm=0, random_state=random_state)
     assert own_scores_intercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_scores, own_scores_intercept, decimal=6)
+    assert_allclose(ref_scores, own_scores_intercept, rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_intercept_nocovar_multivariate(random_state=0):
@@ -561,14 +569,14 @@ def test_permuted_ols_intercept_nocovar_multivariate(random_state=0):
         tested_vars, target_vars, confounding_vars=None, n_perm=0,
         random_state=random_state)
     assert own_scores.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_scores, own_scores, decimal=6)
+    assert_allclose(ref_scores, own_scores, rtol=0, atol=1.5e-6)
 
     # same thing but with model_intercept=True to check it has no effect
     _, own_scores_intercept, _ = permuted_ols(
         tested_vars, target_vars, confounding_vars=None, model_intercept=True,
         n_perm=0, random_state=random_state)
     assert own_scores_intercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(ref_scores, own_scores_intercept, decimal=6)
+    assert_allclose(ref_scores, own_scores_intercept, rtol=0, atol=1.5e-6)
 
 
 def test_permuted_ols_intercept_withcovar_multivariate(random_state=0):
@@ -595,14 +603,14 @@ def test_permuted_ols_intercept_withcovar_multivariate(random_state=0):
         tested_var, target_vars, confounding_vars, n_perm=0,
         random_state=random_state)
     assert own_scores.shape == (n_regressors, n_descriptors)
-    assert_almost_equal(ref_scores, own_scores, decimal=6)
+    assert_allclose(ref_scores, own_scores, rtol=0, atol=1.5e-6)
 
     # same thing but with model_intercept=True to check it has no effect
     _, own_scores_intercept, _ = permuted_ols(
         tested_var, target_vars, confounding_vars, model_intercept=True,
         n_perm=0, random_state=random_state)
     assert own_scores_intercept.shape == (n_regressors, n_descriptors)
-    assert_array_almost_equal(own_scores, own_scores_intercept, decimal=6)
+    assert_allclose(own_scores, own_scores_intercept, rtol=0, atol=1.5e-6)
 
 
 ### Test one-sided versus two-sided ###########################################
@@ -355,9 +355,13 @@ class Parcellations(MultiPCA):
 
             from sklearn.cluster import AgglomerativeClustering
 
+            # The full tree is always computed so that the cached tree does
+            # not depend on n_parcels: fitting again with another number of
+            # parcels only cuts the cached tree instead of building a new one
             agglomerative = AgglomerativeClustering(
                 n_clusters=self.n_parcels, connectivity=connectivity,
-                linkage=self.method, memory=self.memory)
+                linkage=self.method, memory=self.memory,
+                compute_full_tree=True)
 
             labels = self._cache(_estimator_fit,
                                  func_memory_level=1)(components.T,
@@ -374,6 +378,10 @@ class Parcellations(MultiPCA):
                                  'match the requested number of parcels.')
             warnings.warn(message=n_parcels_warning, category=UserWarning,
                           stacklevel=3)
+        # Store labels with the smallest unsigned integer type holding them
+        # (e.g. uint16 for a few thousands parcels) rather than int64, which
+        # makes labels_img_ smaller in memory and on disk
+        labels = labels.astype(np.min_scalar_type(labels.max()))
         self.labels_img_ = self.masker_.inverse_transform(labels)
 
         return self
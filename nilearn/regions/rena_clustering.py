@@ -43,7 +43,9 @@ def _compute_weights(X, mask_img):
     mask = get_data(mask_img).astype('bool')
     shape = mask.shape
 
-    data = np.empty((shape[0], shape[1], shape[2], n_samples))
+    # float32 data are kept in float32, other types are computed in float64
+    dtype = X.dtype if X.dtype.kind == 'f' else np.float64
+    data = np.empty((shape[0], shape[1], shape[2], n_samples), dtype=dtype)
     for sample in range(n_samples):
         data[:, :, :, sample] = \
             _unmask_from_to_3d_array(X[sample].copy(), mask)
@@ -244,17 +246,22 @@ def _reduce_data_and_connectivity(X, labels, n_components, connectivity,
     """
     n_features = len(labels)
 
+    # The floating point type of X is kept all along, so that float32 data
+    # are not silently upcast to float64. Other types are reduced in float64.
+    dtype = X.dtype if X.dtype.kind == 'f' else np.float64
     incidence = coo_matrix(
         (np.ones(n_features), (labels, np.arange(n_features))),
-        shape=(n_components, n_features), dtype=np.float32).tocsc()
+        shape=(n_components, n_features), dtype=dtype).tocsc()
 
     inv_sum_col = dia_matrix(
-        (np.array(1. / incidence.sum(axis=1)).squeeze(), 0),
+        (np.array(1. / incidence.sum(axis=1), dtype=dtype).squeeze(), 0),
         shape=(n_components, n_components))
 
     incidence = inv_sum_col * incidence
 
-    reduced_X = (incidence * X.T).T
+    # shape (n_components, n_samples): one contiguous row per cluster
+    reduced_X_t = incidence * X.T
+    reduced_X = reduced_X_t.T
     reduced_connectivity = (incidence * connectivity) * incidence.T
 
     reduced_connectivity = reduced_connectivity - dia_matrix(
@@ -263,9 +270,10 @@ def _reduce_data_and_connectivity(X, labels, n_components, connectivity,
 
     i_idx, j_idx = reduced_connectivity.nonzero()
 
-    weights_ = np.sum(
-        (reduced_X[:, i_idx] - reduced_X[:, j_idx]) ** 2,
-        axis=0)
+    # Gather contiguous rows rather than strided columns, and reduce the
+    # squared differences without allocating a second temporary
+    diff = reduced_X_t[i_idx] - reduced_X_t[j_idx]
+    weights_ = np.einsum('ij,ij->i', diff, diff)
     weights_ = np.maximum(threshold, weights_)
     reduced_connectivity.data = weights_
 
@@ -538,16 +546,25 @@ class ReNA(BaseEstimator, ClusterMixin, TransformerMixin):
 
         check_is_fitted(self, "labels_")
 
-        unique_labels = np.unique(self.labels_)
+        _, inverse = np.unique(self.labels_, return_inverse=True)
+        n_features = len(inverse)
+
+        # Averaging the signal of each cluster is a single product with the
+        # normalized incidence matrix, shape (n_clusters, n_features). It is
+        # built in the floating point type of X, so that float32 data give
+        # float32 averages.
+        dtype = X.dtype if X.dtype.kind == 'f' else np.float64
+        incidence = coo_matrix(
+            (np.ones(n_features), (inverse, np.arange(n_features))),
+            shape=(self.n_clusters_, n_features), dtype=dtype).tocsr()
 
-        mean_cluster = []
-        for label in unique_labels:
-            mean_cluster.append(np.mean(X[:, self.labels_ == label], axis=1))
+        inv_sizes = dia_matrix((np.array(1. / self.sizes_, dtype=dtype), 0),
+                               shape=(self.n_clusters_, self.n_clusters_))
 
-        X_red = np.array(mean_cluster).T
+        X_red = ((inv_sizes * incidence) * X.T).T
 
         if self.scaling:
-            X_red = X_red * np.sqrt(self.sizes_)
+            X_red = X_red * np.sqrt(self.sizes_).astype(dtype)
 
         return X_red
 
@@ -571,7 +588,8 @@ class ReNA(BaseEstimator, ClusterMixin, TransformerMixin):
         _, inverse = np.unique(self.labels_, return_inverse=True)
 
         if self.scaling:
-            X_red = X_red / np.sqrt(self.sizes_)
+            dtype = X_red.dtype if X_red.dtype.kind == 'f' else np.float64
+            X_red = X_red / np.sqrt(self.sizes_).astype(dtype)
         X_inv = X_red[..., inverse]
 
         return X_inv
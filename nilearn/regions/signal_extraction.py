@@ -200,21 +200,14 @@ def signals_to_img_labels(signals, labels_img, mask_img=None,
         labels_data = labels_data.copy()
         labels_data[np.logical_not(mask_data)] = background_label
 
-    # nditer is not available in numpy 1.3: using multiple loops.
-    # Using these loops still gives a much faster code (6x) than this one:
-    ## for n, label in enumerate(labels):
-    ##     data[labels_data == label, :] = signals[:, n]
     data = np.zeros(target_shape + (signals.shape[0],),
                     dtype=signals.dtype, order=order)
-    labels_dict = dict([(label, n) for n, label in enumerate(labels)])
-    # optimized for "data" in F order.
-    for k in range(labels_data.shape[2]):
-        for j in range(labels_data.shape[1]):
-            for i in range(labels_data.shape[0]):
-                label = labels_data[i, j, k]
-                num = labels_dict.get(label, None)
-                if num is not None:
-                    data[i, j, k, :] = signals[:, num]
+    # labels is sorted (it comes from np.unique): each voxel in a region is
+    # mapped to the index of its signal, then all signals are broadcast to
+    # their voxels at once.
+    in_region = labels_data != background_label
+    signal_index = np.searchsorted(labels, labels_data[in_region])
+    data[in_region] = signals.T[signal_index]
 
     return new_img_like(labels_img, data, target_affine)
 
@@ -299,3 +299,37 @@ def test_transform_3d_input_images():
     X = parcellate.fit_transform(imgs[0])
     assert isinstance(X, np.ndarray)
     assert X.shape == (1, 20)
+
+
+def test_parcellations_ward_reuses_cached_tree(tmp_path):
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 11, 12, 5)
+    img = nibabel.Nifti1Image(data, affine=np.eye(4))
+    mask_img = nibabel.Nifti1Image(np.ones((10, 11, 12)), np.eye(4))
+
+    # The same cached ward tree is cut at different numbers of parcels. Above
+    # 100 parcels, scikit-learn only builds the full tree when asked to.
+    for n_parcels in [150, 300]:
+        parcellator = Parcellations(method='ward', n_parcels=n_parcels,
+                                    mask=mask_img, memory=str(tmp_path))
+        parcellator.fit(img)
+        labels = np.unique(parcellator.labels_img_.get_fdata())
+        assert len(labels[labels != 0]) == n_parcels
+
+    # a single ward tree has been computed and cached for both fits
+    ward_tree_calls = [path for path in tmp_path.glob('**/ward_tree/*')
+                       if path.is_dir()]
+    assert len(ward_tree_calls) == 1
+
+
+def test_parcellations_labels_img_dtype():
+    rng = np.random.RandomState(0)
+    data = rng.randn(10, 11, 12, 5)
+    img = nibabel.Nifti1Image(data, affine=np.eye(4))
+    mask_img = nibabel.Nifti1Image(np.ones((10, 11, 12)), np.eye(4))
+
+    for n_parcels, dtype in [(10, np.uint8), (300, np.uint16)]:
+        parcellator = Parcellations(method='ward', n_parcels=n_parcels,
+                                    mask=mask_img)
+        parcellator.fit(img)
+        assert parcellator.labels_img_.get_data_dtype() == dtype
@@ -1,12 +1,15 @@
 import numpy as np
 import pytest
+from sklearn.metrics import adjusted_rand_score
 
 try:
     from joblib import Memory
 except ImportError:
     from joblib import Memory
 from nilearn._utils.data_gen import generate_fake_fmri
-from nilearn.regions.rena_clustering import ReNA
+from nilearn.regions.rena_clustering import (
+    ReNA, _compute_weights, _reduce_data_and_connectivity,
+    weighted_connectivity_graph)
 from nilearn.input_data import NiftiMasker
 from nilearn.image import get_data
 
@@ -50,3 +53,62 @@ def test_rena_clustering():
         assert n_clusters != rena.n_clusters_
 
     del n_voxels, X_red, X_compress
+
+
+def test_rena_transform_cluster_means():
+    data_img, mask_img = generate_fake_fmri(shape=(10, 11, 12), length=5)
+    X = NiftiMasker(mask_img=mask_img).fit_transform(data_img)
+
+    rena = ReNA(mask_img, n_clusters=10).fit(X)
+    X_red = rena.transform(X)
+
+    expected = np.array([np.mean(X[:, rena.labels_ == label], axis=1)
+                         for label in np.unique(rena.labels_)]).T
+    np.testing.assert_array_almost_equal(X_red, expected)
+
+    # the averages keep the floating point type of the data
+    X_32 = X.astype(np.float32)
+    X_red_32 = rena.transform(X_32)
+    assert X_red_32.dtype == np.float32
+    assert rena.inverse_transform(X_red_32).dtype == np.float32
+    np.testing.assert_allclose(X_red_32, expected, rtol=1e-5)
+
+    # also when the averages are scaled by the size of the clusters
+    rena_scaled = ReNA(mask_img, n_clusters=10, scaling=True).fit(X)
+    X_red_32 = rena_scaled.transform(X_32)
+    assert X_red_32.dtype == np.float32
+    assert rena_scaled.inverse_transform(X_red_32).dtype == np.float32
+
+
+def test_rena_clustering_float32():
+    data_img, mask_img = generate_fake_fmri(shape=(10, 11, 12), length=5)
+    X = NiftiMasker(mask_img=mask_img).fit_transform(data_img)
+
+    rena_64 = ReNA(mask_img, n_clusters=10).fit(X.astype(np.float64))
+    rena_32 = ReNA(mask_img, n_clusters=10).fit(X.astype(np.float32))
+
+    # distances computed in float32 may break ties differently
+    assert adjusted_rand_score(rena_64.labels_, rena_32.labels_) >= 0.999
+
+    # float32 data are not upcast when computing the edge weights, nor
+    # during the reduction steps
+    X_32 = X.astype(np.float32)
+    assert _compute_weights(X_32, mask_img).dtype == np.float32
+    n_features = X_32.shape[1]
+    connectivity = weighted_connectivity_graph(X_32, mask_img)
+    labels = np.arange(n_features) % 10
+    _, reduced_X = _reduce_data_and_connectivity(X_32, labels, 10,
+                                                 connectivity)
+    assert reduced_X.dtype == np.float32
+
+
+def test_rena_clustering_integer_data():
+    data_img, mask_img = generate_fake_fmri(shape=(10, 11, 12), length=5)
+    X = NiftiMasker(mask_img=mask_img).fit_transform(data_img)
+    X_int = np.round(10 * X).astype(np.int64)
+
+    rena_int = ReNA(mask_img, n_clusters=10).fit(X_int)
+    rena_float = ReNA(mask_img, n_clusters=10).fit(X_int.astype(np.float64))
+
+    assert rena_int.n_clusters_ == rena_float.n_clusters_
+    np.testing.assert_array_equal(rena_int.labels_, rena_float.labels_)
@@ -203,6 +203,40 @@ def test_apply_mask():
                   Nifti1Image(data, affine), mask_img)
 
 
+def test_apply_mask_bounding_box(monkeypatch):
+    # Without smoothing, only the bounding box of the mask is used: the
+    # result must not depend on the data outside of it
+    rng = check_random_state(42)
+    data = rng.randn(10, 11, 12, 3)
+    data[0, 0, 0] = np.nan
+    mask = np.zeros((10, 11, 12))
+    mask[2:5, 3:8, 4] = 1
+    mask[6, 9, 10] = 1
+    affine = np.eye(4)
+    expected = data[mask.astype(bool)].T
+    for create_files in (False, True):
+        with write_tmp_imgs(Nifti1Image(data, affine),
+                            Nifti1Image(mask, affine),
+                            create_files=create_files) as imgs:
+            series = masking.apply_mask(imgs[0], imgs[1])
+        assert_array_equal(series, expected)
+
+    # only the bounding box of the data is converted and copied
+    converted_shapes = []
+    as_ndarray = masking._utils.as_ndarray
+
+    def recording_as_ndarray(arr, *args, **kwargs):
+        converted_shapes.append(arr.shape)
+        return as_ndarray(arr, *args, **kwargs)
+
+    monkeypatch.setattr(masking._utils, 'as_ndarray', recording_as_ndarray)
+    series = masking._apply_mask_fmri(Nifti1Image(data, affine),
+                                      Nifti1Image(mask, affine))
+    assert_array_equal(series, expected)
+    assert (5, 7, 7, 3) in converted_shapes
+    assert data.shape not in converted_shapes
+
+
 def test_unmask():
     # A delta in 3D
     shape = (10, 20, 30, 40)